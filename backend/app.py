@@ -1,327 +1,101 @@
-from flask import Flask, request, jsonify
+from flask import Blueprint, Flask, Response, current_app, request, jsonify, stream_with_context
 from flask_cors import CORS
-import requests
-import re
-import random
-import os
+import json
 from datetime import datetime
+from config import load_config
+from deadlines import Deadline
+from providers import Providers
+from ranking import paginate, page_from_cursor, parse_difficulty
 
-app = Flask(__name__)
-CORS(app)
+bp = Blueprint('seo_agent', __name__)
 
-class KeywordExpander:
-    def __init__(self):
-        self.ollama_url = "http://localhost:11434/api/generate"
-        self.model = "mistral"
-        
-    def expand(self, seed_keyword):
-        try:
-            # Check if Ollama is running
-            try:
-                response = requests.get("http://localhost:11434/api/tags", timeout=5)
-                if response.status_code != 200:
-                    print("⚠️  Ollama not running. Using mock data.")
-                    return self._generate_mock_keywords(seed_keyword)
-            except:
-                print("⚠️  Cannot connect to Ollama. Using mock data.")
-                return self._generate_mock_keywords(seed_keyword)
-            
-            prompt = f"""
-            Generate SEO keyword variations for "{seed_keyword}". Return ONLY a comma-separated list.
-            Include: long-tail keywords, question-based, geographic variations, comparison keywords.
-            Example: best {seed_keyword}, how to {seed_keyword}, {seed_keyword} near me
-            """
-            
-            data = {
-                "model": self.model,
-                "prompt": prompt,
-                "stream": False,
-                "options": {"temperature": 0.7}
-            }
-            
-            response = requests.post(self.ollama_url, json=data, timeout=30)
-            
-            if response.status_code == 200:
-                result = response.json()
-                keywords_text = result["response"].strip()
-                
-                # Clean the response
-                keywords_text = re.sub(r'^\d+\.\s*', '', keywords_text, flags=re.MULTILINE)
-                keywords_text = re.sub(r'["\']', '', keywords_text)
-                
-                # Split by commas and newlines
-                keywords = []
-                for line in keywords_text.split('\n'):
-                    for kw in line.split(','):
-                        clean_kw = kw.strip()
-                        if clean_kw and len(clean_kw) > 2:
-                            keywords.append(clean_kw)
-                
-                unique_keywords = list(set(keywords))
-                print(f"✅ AI generated {len(unique_keywords)} keywords")
-                return unique_keywords[:50]
-                
-            else:
-                print("❌ Ollama API error. Using mock data.")
-                return self._generate_mock_keywords(seed_keyword)
-                
-        except Exception as e:
-            print(f"❌ Error: {e}. Using mock data.")
-            return self._generate_mock_keywords(seed_keyword)
-    
-    def _generate_mock_keywords(self, seed_keyword):
-        """Generate exactly 50 mock keywords when Ollama is not available"""
-        patterns = [
-            # Basic variations
-            f"best {seed_keyword}", f"how to {seed_keyword}", f"{seed_keyword} for beginners",
-            f"affordable {seed_keyword}", f"{seed_keyword} near me", f"{seed_keyword} 2024",
-            f"free {seed_keyword}", f"professional {seed_keyword}", f"{seed_keyword} tips",
-            f"{seed_keyword} course", f"{seed_keyword} tutorial", f"what is {seed_keyword}",
-            f"learn {seed_keyword}", f"{seed_keyword} guide", f"{seed_keyword} tools",
-            
-            # Strategy and techniques
-            f"{seed_keyword} strategies", f"{seed_keyword} techniques", f"{seed_keyword} examples",
-            f"{seed_keyword} ideas", f"{seed_keyword} plan", f"{seed_keyword} checklist",
-            f"{seed_keyword} template", f"{seed_keyword} software", f"{seed_keyword} platform",
-            f"{seed_keyword} agency", f"{seed_keyword} consultant", f"{seed_keyword} expert",
-            
-            # Services and solutions
-            f"{seed_keyword} services", f"{seed_keyword} solutions", f"{seed_keyword} company",
-            f"{seed_keyword} trends 2024", f"{seed_keyword} statistics", f"{seed_keyword} data",
-            f"{seed_keyword} analysis", f"{seed_keyword} report", f"{seed_keyword} case study",
-            
-            # Success and benefits
-            f"{seed_keyword} success stories", f"{seed_keyword} benefits", f"{seed_keyword} advantages",
-            f"{seed_keyword} vs traditional marketing", f"{seed_keyword} best practices",
-            f"{seed_keyword} for small business", f"{seed_keyword} for startups",
-            
-            # Specific use cases
-            f"{seed_keyword} for ecommerce", f"{seed_keyword} for local business",
-            f"{seed_keyword} on a budget", f"{seed_keyword} without spending money",
-            f"{seed_keyword} quick start", f"{seed_keyword} step by step",
-            f"{seed_keyword} ultimate guide", f"{seed_keyword} complete course",
-            
-            # Question-based
-            f"how to start {seed_keyword}", f"why {seed_keyword} is important",
-            f"when to use {seed_keyword}", f"where to learn {seed_keyword}",
-            f"which {seed_keyword} tools are best", f"what is the cost of {seed_keyword}",
-            f"is {seed_keyword} worth it", f"how much does {seed_keyword} cost",
-            
-            # Comparison keywords
-            f"{seed_keyword} vs social media marketing", f"{seed_keyword} alternatives",
-            f"{seed_keyword} compared to", f"best {seed_keyword} strategies",
-            
-            # Geographic variations
-            f"{seed_keyword} in new york", f"{seed_keyword} services london",
-            f"best {seed_keyword} los angeles", f"{seed_keyword} near me",
-            f"{seed_keyword} in usa", f"{seed_keyword} uk", f"{seed_keyword} australia",
-            
-            # Advanced topics
-            f"advanced {seed_keyword}", f"{seed_keyword} masterclass",
-            f"{seed_keyword} certification", f"{seed_keyword} training",
-            f"{seed_keyword} workshop", f"{seed_keyword} webinar",
-            
-            # Additional patterns to reach 50
-            f"effective {seed_keyword}", f"successful {seed_keyword}",
-            f"proven {seed_keyword} methods", f"{seed_keyword} optimization",
-            f"{seed_keyword} management", f"{seed_keyword} automation"
-        ]
-        
-        # Ensure we have exactly 50 unique keywords
-        unique_patterns = list(set(patterns))
-        return unique_patterns[:50]  # Return exactly 50 keywords
+def get_providers():
+    return current_app.extensions['seo_agent']
 
-class SERankingAnalyzer:
-    def __init__(self):
-        self.api_key = os.getenv('SE_RANKING_API_KEY', '')
-        self.base_url = "https://api4.seranking.com"
-        
-    def analyze(self, keywords):
-        analyzed_keywords = []
-        
-        for keyword in keywords:
-            try:
-                # Try to get real data from SE Ranking API
-                volume, competition, cpc = self._get_se_ranking_data(keyword)
-                
-                opportunity_score = self._calculate_opportunity_score(volume, competition, cpc)
-                
-                analyzed_keywords.append({
-                    'keyword': keyword,
-                    'monthly_volume': volume,
-                    'competition': competition,
-                    'cpc': cpc,
-                    'opportunity_score': opportunity_score,
-                    'difficulty': self._get_difficulty_label(competition),
-                    'data_source': 'SE Ranking API'
-                })
-                
-            except Exception as e:
-                print(f"SE Ranking API error for '{keyword}': {e}")
-                # Fallback to enhanced estimation
-                volume, competition, cpc = self._get_enhanced_estimated_data(keyword)
-                analyzed_keywords.append({
-                    'keyword': keyword,
-                    'monthly_volume': volume,
-                    'competition': competition,
-                    'cpc': cpc,
-                    'opportunity_score': self._calculate_opportunity_score(volume, competition, cpc),
-                    'difficulty': self._get_difficulty_label(competition),
-                    'data_source': 'Estimated (API Fallback)'
-                })
-        
-        return analyzed_keywords
-    
-    def _get_se_ranking_data(self, keyword):
-        """Get real SEO data from SE Ranking API"""
-        try:
-            # First, try the keyword suggestions endpoint
-            url = f"{self.base_url}/research/keywords/suggestions"
-            headers = {
-                'Authorization': f'Token {self.api_key}',
-                'Content-Type': 'application/json'
-            }
-            data = {
-                'keyword': keyword,
-                'language': 'en',
-                'country': 'us'
-            }
-            
-            response = requests.post(url, json=data, headers=headers, timeout=15)
-            
-            if response.status_code == 200:
-                api_data = response.json()
-                print(f"🔍 SE Ranking API response for '{keyword}': {api_data}")
-                
-                # Parse the response based on SE Ranking's format
-                if isinstance(api_data, list) and len(api_data) > 0:
-                    # Get the most relevant suggestion
-                    keyword_data = api_data[0]
-                    volume = keyword_data.get('search_volume', 100)
-                    competition = keyword_data.get('competition_level', 50)
-                    cpc = keyword_data.get('cpc', 1.0)
-                    
-                    return volume, competition, cpc
-                
-            # If suggestions endpoint doesn't work, try analysis endpoint
-            analysis_url = f"{self.base_url}/analysis/keyword"
-            analysis_data = {
-                'keyword': keyword,
-                'country': 'us',
-                'language': 'en'
-            }
-            
-            analysis_response = requests.post(analysis_url, json=analysis_data, headers=headers, timeout=15)
-            
-            if analysis_response.status_code == 200:
-                analysis_data = analysis_response.json()
-                volume = analysis_data.get('search_volume', 100)
-                competition = analysis_data.get('competition', 50)
-                cpc = analysis_data.get('cpc', 1.0)
-                return volume, competition, cpc
-                
-            # If both API calls fail, use estimation
-            return self._get_enhanced_estimated_data(keyword)
-                
-        except Exception as e:
-            print(f"SE Ranking API connection error: {e}")
-            return self._get_enhanced_estimated_data(keyword)
+def get_ranking_params(source, default_limit=50):
+    """Read limit/offset/min_score/difficulty/cursor from query args or a JSON body.
+
+    Raises ValueError for anything malformed, including JSON values of the
+    wrong type such as {"limit": null}.
+    """
+    try:
+        limit = int(source.get('limit', default_limit))
+        offset = int(source.get('offset', 0))
+        min_score = source.get('min_score')
+        min_score = float(min_score) if min_score not in (None, '') else None
+        deadline = get_deadline(source)
+    except TypeError as e:
+        raise ValueError(f"Invalid parameter: {e}")
+    if limit < 1 or offset < 0:
+        raise ValueError('limit must be positive and offset must not be negative')
+    cursor = source.get('cursor')
+    if cursor is not None and not isinstance(cursor, str):
+        raise ValueError('cursor must be a string')
+    return {
+        'limit': min(limit, 500),
+        'offset': offset,
+        'min_score': min_score,
+        'difficulty': parse_difficulty(source.get('difficulty')),
+        'cursor': cursor,
+        'locales': parse_locales(source.get('locales')),
+        'deadline': deadline
+    }
+
+def get_deadline(source):
+    """Request budget in seconds from the X-Request-Timeout header, a timeout param or config"""
+    seconds = request.headers.get('X-Request-Timeout') or source.get('timeout') or current_app.config['REQUEST_TIMEOUT']
+    seconds = float(seconds)
+    if seconds < 0:
+        raise ValueError('timeout must not be negative')
+    return Deadline(seconds) if seconds else None
+
+def parse_locales(value):
+    """Accept 'us-en,de-de', ['us-en', 'gb-en'] or [{'country': 'fr', 'language': 'fr'}]"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, (list, tuple)):
+        raise ValueError('locales must be a string or a list')
     
-    def _get_enhanced_estimated_data(self, keyword):
-        """Enhanced estimation when API is unavailable"""
-        word_count = len(keyword.split())
-        keyword_lower = keyword.lower()
-        
-        # Volume estimation based on keyword characteristics
-        base_volume = 1000
-        
-        # Adjust volume based on keyword intent
-        if any(term in keyword_lower for term in ['how to', 'what is', 'why', 'tutorial']):
-            base_volume = 2500  # Informational queries
-        elif any(term in keyword_lower for term in ['buy', 'price', 'cost', 'for sale']):
-            base_volume = 1800  # Commercial intent
-        elif any(term in keyword_lower for term in ['near me', 'local', 'city']):
-            base_volume = 1200  # Local intent
-            
-        # Long-tail keywords have lower volume
-        if word_count > 3:
-            base_volume = max(100, base_volume // (word_count - 1))
-        
-        # Competition estimation
-        if word_count <= 2:
-            competition = random.randint(75, 95)  # High competition for short keywords
-        elif word_count == 3:
-            competition = random.randint(45, 75)  # Medium competition
+    locales = []
+    for item in value:
+        if isinstance(item, dict):
+            country, language = item.get('country', ''), item.get('language', 'en')
+            if not isinstance(country, str) or not isinstance(language, str):
+                raise ValueError(f"Invalid locale: {item}")
+        elif not isinstance(item, str):
+            raise ValueError(f"Invalid locale: {item}")
         else:
-            competition = random.randint(15, 45)  # Low competition for long-tail
-            
-        # Adjust competition for commercial terms
-        commercial_terms = ['buy', 'price', 'cost', 'deal', 'discount', 'cheap', 'sale']
-        if any(term in keyword_lower for term in commercial_terms):
-            competition = min(95, competition + 20)
-            
-        # CPC estimation (Cost Per Click)
-        cpc = max(0.5, competition / 50)  # Higher competition = higher CPC
-        
-        return base_volume, competition, round(cpc, 2)
-    
-    def _calculate_opportunity_score(self, volume, competition, cpc):
-        """Calculate opportunity score considering volume, competition, and CPC"""
-        # Normalize volume (0-1 scale)
-        volume_score = min(volume / 10000, 1.0)
-        
-        # Invert competition (lower competition = higher score)
-        competition_score = 1 - (competition / 100)
-        
-        # CPC indicates commercial value (higher CPC = more valuable)
-        cpc_score = min(cpc / 10, 1.0)
-        
-        # Weighted combination (40% volume, 40% competition, 20% CPC value)
-        opportunity_score = (volume_score * 0.4) + (competition_score * 0.4) + (cpc_score * 0.2)
-        
-        return round(opportunity_score * 100, 2)
+            country, _, language = str(item).strip().replace('_', '-').partition('-')
+            language = language or 'en'
+        country, language = country.strip().lower(), language.strip().lower()
+        if not country.isalpha() or not language.isalpha():
+            raise ValueError(f"Invalid locale: {item}")
+        if (country, language) not in locales:
+            locales.append((country, language))
     
-    def _get_difficulty_label(self, competition):
-        if competition < 30:
-            return "Very Easy"
-        elif competition < 50:
-            return "Easy"
-        elif competition < 70:
-            return "Medium"
-        elif competition < 85:
-            return "Hard"
-        else:
-            return "Very Hard"
-
-# N8N Webhook Integration
-class N8NIntegration:
-    @staticmethod
-    def process_n8n_webhook(data):
-        """Process incoming webhook requests from N8N"""
-        try:
-            keyword = data.get('keyword', '').strip()
-            if not keyword:
-                return {'error': 'No keyword provided'}, 400
-                
-            # You can add additional N8N-specific processing here
-            # For example: logging, rate limiting, custom formatting
-            
-            return {'status': 'success', 'keyword_received': keyword}
-        except Exception as e:
-            return {'error': str(e)}, 500
+    if len(locales) > 10:
+        raise ValueError('At most 10 locales per request')
+    return locales or None
 
-# Initialize components with SE Ranking Analyzer
-expander = KeywordExpander()
-analyzer = SERankingAnalyzer()  # CHANGED TO SE RANKING ANALYZER
-n8n_integration = N8NIntegration()
+def analyze_for_request(keywords, params):
+    """Single-market analysis by default, side-by-side markets when locales are given"""
+    if params['locales']:
+        return get_providers().analyzer.analyze_locales(
+            keywords, params['locales'], min_score=params['min_score'], deadline=params['deadline']
+        )
+    return get_providers().analyzer.analyze(keywords, min_score=params['min_score'], deadline=params['deadline'])
 
-@app.route('/')
+@bp.route('/')
 def home():
     return jsonify({
         'message': 'SEO Keyword AI Agent is running!', 
         'endpoints': [
             '/health', 
             '/generate-keywords',
+            '/expand-graph',
+            '/bulk-keywords',
             '/n8n-webhook'
         ],
         'features': [
@@ -333,42 +107,56 @@ def home():
         'se_ranking_api': 'Active'  # ADDED
     })
 
-@app.route('/health', methods=['GET'])
+@bp.route('/health', methods=['GET'])
 def health_check():
     return jsonify({
         'status': 'healthy', 
         'message': 'SEO Keyword AI Agent is running',
         'timestamp': datetime.now().isoformat(),
         'version': '2.0',
-        'se_ranking_api': 'Connected'  # ADDED
+        'se_ranking_api': 'Connected',  # ADDED
+        # Reported without building anything, so /health stays cheap
+        'providers_initialized': get_providers().initialized()
     })
 
 # N8N-specific webhook endpoint
-@app.route('/n8n-webhook', methods=['POST'])
+@bp.route('/n8n-webhook', methods=['POST'])
 def n8n_webhook():
     """Special endpoint for N8N workflow integration"""
     try:
         data = request.get_json()
         
         # Process N8N webhook
-        n8n_result, status_code = n8n_integration.process_n8n_webhook(data)
+        n8n_result, status_code = get_providers().n8n_integration.process_n8n_webhook(data)
         if status_code != 200:
             return jsonify(n8n_result), status_code
             
         keyword = data.get('keyword', '').strip()
         if not keyword:
             return jsonify({'error': 'Keyword is required'}), 400
+        
+        try:
+            params = get_ranking_params(data)
+        except ValueError as e:
+            return jsonify({'error': str(e), 'n8n_processed': False}), 400
             
         # Generate keywords (same as main endpoint)
-        expanded_keywords = expander.expand(keyword)
-        analyzed_keywords = analyzer.analyze(expanded_keywords)
-        sorted_keywords = sorted(analyzed_keywords, key=lambda x: x['opportunity_score'], reverse=True)[:50]  # [:50] means top 50        
+        expanded_keywords = get_providers().expander.expand(keyword, params['deadline'])
+        analyzed_keywords = analyze_for_request(expanded_keywords, params)
+        sorted_keywords, total_matches, next_cursor = paginate(
+            analyzed_keywords, params['limit'], params['offset'],
+            params['min_score'], params['difficulty'],
+            cache=get_providers().result_cache,
+            meta={'seed_keyword': keyword, 'total_generated': len(expanded_keywords)}
+        )
         # N8N-specific response format
         return jsonify({
             'n8n_processed': True,
             'seed_keyword': keyword,
             'keywords': sorted_keywords,
             'total_generated': len(expanded_keywords),
+            'total_matches': total_matches,
+            'next_cursor': next_cursor,
             'top_opportunity': sorted_keywords[0] if sorted_keywords else None,
             'data_source': 'SE Ranking API + Ollama AI'  # UPDATED
         })
@@ -376,35 +164,71 @@ def n8n_webhook():
     except Exception as e:
         return jsonify({'error': str(e), 'n8n_processed': False}), 500
 
-@app.route('/generate-keywords', methods=['GET', 'POST'])
+@bp.route('/generate-keywords', methods=['GET', 'POST'])
 def generate_keywords():
     try:
         if request.method == 'GET':
-            seed_keyword = request.args.get('keyword', 'digital marketing')
+            data = request.args
         else:
-            data = request.get_json()
-            seed_keyword = data.get('keyword', 'digital marketing') if data else 'digital marketing'
+            data = request.get_json(silent=True) or {}
+        
+        try:
+            params = get_ranking_params(data)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
+        # Page through a cached result set without recomputing
+        if params['cursor']:
+            if params['min_score'] is not None or params['difficulty']:
+                return jsonify({'error': 'cursor pages keep the filters of the original request; '
+                                         'do not send min_score or difficulty with a cursor'}), 400
+            try:
+                sorted_keywords, total_matches, next_cursor, meta = page_from_cursor(
+                    get_providers().result_cache, params['cursor'], params['limit']
+                )
+            except ValueError as e:
+                return jsonify({'error': str(e)}), 400
+            except KeyError as e:
+                return jsonify({'error': str(e.args[0])}), 410
+            
+            return jsonify({
+                'seed_keyword': meta.get('seed_keyword'),
+                'keywords': sorted_keywords,
+                'total_generated': meta.get('total_generated'),
+                'total_matches': total_matches,
+                'next_cursor': next_cursor,
+                'analysis_method': 'SE Ranking API + Ollama AI',
+                'api_used': 'SE Ranking Professional'
+            })
         
-        seed_keyword = seed_keyword.strip()
+        seed_keyword = (data.get('keyword') or 'digital marketing').strip()
         if not seed_keyword:
             return jsonify({'error': 'Please provide a keyword'}), 400
         
         print(f"🚀 Processing keyword: {seed_keyword}")
         
         # Expand keywords
-        expanded_keywords = expander.expand(seed_keyword)
+        expanded_keywords = get_providers().expander.expand(seed_keyword, params['deadline'])
         print(f"✅ Generated {len(expanded_keywords)} keyword variations")
         
-        # Analyze SEO metrics with SE Ranking API
-        analyzed_keywords = analyzer.analyze(expanded_keywords)
+        # Analyze SEO metrics with SE Ranking API (expansion runs once for all locales)
+        analyzed_keywords = analyze_for_request(expanded_keywords, params)
         
-        # Sort by opportunity score
-        sorted_keywords = sorted(analyzed_keywords, key=lambda x: x['opportunity_score'], reverse=True)[:50]
+        # Rank by opportunity score and keep the full set for cursor paging
+        sorted_keywords, total_matches, next_cursor = paginate(
+            analyzed_keywords, params['limit'], params['offset'],
+            params['min_score'], params['difficulty'],
+            cache=get_providers().result_cache,
+            meta={'seed_keyword': seed_keyword, 'total_generated': len(expanded_keywords)}
+        )
         
         return jsonify({
             'seed_keyword': seed_keyword,
             'keywords': sorted_keywords,
             'total_generated': len(expanded_keywords),
+            'total_matches': total_matches,
+            'next_cursor': next_cursor,
+            'markets': [f"{c}-{l}" for c, l in params['locales']] if params['locales'] else None,
             'analysis_method': 'SE Ranking API + Ollama AI',  # UPDATED
             'api_used': 'SE Ranking Professional'  # ADDED
         })
@@ -413,8 +237,85 @@ def generate_keywords():
         print(f"❌ Error: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+# Recursive expansion, streamed as newline-delimited JSON
+@bp.route('/expand-graph', methods=['GET', 'POST'])
+def expand_graph():
+    """Expand the best keywords again and stream every node as it is found"""
+    if request.method == 'GET':
+        data = request.args
+    else:
+        data = request.get_json(silent=True) or {}
+    
+    seed_keyword = (data.get('keyword') or '').strip()
+    if not seed_keyword:
+        return jsonify({'error': 'Please provide a keyword'}), 400
+    
+    try:
+        max_depth = min(int(data.get('max_depth', 2)), 5)
+        max_nodes = min(int(data.get('max_nodes', 200)), 2000)
+        time_budget = float(request.headers.get('X-Request-Timeout') or data.get('timeout', 60))
+        min_score = data.get('min_score')
+        min_score = float(min_score) if min_score not in (None, '') else None
+    except (TypeError, ValueError) as e:
+        return jsonify({'error': str(e)}), 400
+    if max_depth < 1 or max_nodes < 1 or time_budget <= 0:
+        return jsonify({'error': 'max_depth, max_nodes and timeout must be positive'}), 400
+    
+    print(f"🕸️  Expanding graph for: {seed_keyword} (depth {max_depth}, {max_nodes} nodes, {time_budget}s)")
+    events = get_providers().graph_explorer.explore(
+        seed_keyword, max_depth=max_depth, max_nodes=max_nodes,
+        time_budget=time_budget, min_score=min_score
+    )
+    
+    def generate():
+        for event in events:
+            yield json.dumps(event) + '\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+# Bulk scoring of large keyword lists with estimated metrics only
+@bp.route('/bulk-keywords', methods=['POST'])
+def bulk_keywords():
+    """Clean, dedup, estimate and score a large keyword list without API lookups.
+
+    Scores are randomized estimates, not cached SE Ranking data, so the
+    ranking and match counts vary between calls.
+    """
+    data = request.get_json(silent=True) or {}
+    keywords = data.get('keywords')
+    if not keywords or not isinstance(keywords, (list, str)):
+        return jsonify({'error': 'Please provide a list of keywords'}), 400
+    if isinstance(keywords, list) and not all(isinstance(kw, str) for kw in keywords):
+        return jsonify({'error': 'keywords must be strings'}), 400
+    
+    unsupported = [name for name in ('cursor', 'locales', 'timeout') if data.get(name)]
+    if request.headers.get('X-Request-Timeout'):
+        unsupported.append('X-Request-Timeout')
+    if unsupported:
+        return jsonify({'error': f"Not supported by /bulk-keywords: {', '.join(unsupported)}"}), 400
+    
+    try:
+        params = get_ranking_params(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    # format=ndjson returns every match, unranked, as newline-delimited JSON
+    as_ndjson = data.get('format') == 'ndjson'
+    result = get_providers().bulk_processor.run(
+        keywords, min_score=params['min_score'], difficulty=params['difficulty'], encode_json=as_ndjson
+    )
+    if as_ndjson:
+        return Response(result.json_lines, mimetype='application/x-ndjson')
+    
+    return jsonify({
+        'keywords': result.top(params['offset'] + params['limit'])[params['offset']:],
+        'total_matches': len(result),
+        'data_source': 'Estimated (Bulk)',
+        'deterministic': False  # estimates are randomized; scores and counts vary per call
+    })
+
 # Additional endpoint for batch processing (N8N compatibility)
-@app.route('/batch-keywords', methods=['POST'])
+@bp.route('/batch-keywords', methods=['POST'])
 def batch_keywords():
     """Process multiple keywords at once for N8N workflows"""
     try:
@@ -424,17 +325,26 @@ def batch_keywords():
         if not keywords or not isinstance(keywords, list):
             return jsonify({'error': 'Please provide a list of keywords'}), 400
         
+        try:
+            params = get_ranking_params(data, default_limit=10)
+        except ValueError as e:
+            return jsonify({'error': str(e)}), 400
+        
         results = []
         for keyword in keywords[:10]:  # Limit to 10 keywords per batch
             try:
-                expanded = expander.expand(keyword)
-                analyzed = analyzer.analyze(expanded)
-                sorted_kws = sorted(analyzed, key=lambda x: x['opportunity_score'], reverse=True)[:10]
+                expanded = get_providers().expander.expand(keyword, params['deadline'])
+                analyzed = analyze_for_request(expanded, params)
+                sorted_kws, total_matches, _ = paginate(
+                    analyzed, params['limit'], params['offset'],
+                    params['min_score'], params['difficulty']
+                )
                 
                 results.append({
                     'seed_keyword': keyword,
                     'top_keywords': sorted_kws,
                     'total_generated': len(expanded),
+                    'total_matches': total_matches,
                     'data_source': 'SE Ranking API'  # ADDED
                 })
             except Exception as e:
@@ -452,8 +362,22 @@ def batch_keywords():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+def create_app(config=None, config_path=None):
+    """Application factory; providers are created lazily on first request"""
+    flask_app = Flask(__name__)
+    CORS(flask_app)
+    
+    settings = load_config(config_path, overrides=config)
+    flask_app.config.update(settings)
+    flask_app.extensions['seo_agent'] = Providers(settings)
+    flask_app.register_blueprint(bp)
+    
+    return flask_app
+
+app = create_app()
+
 if __name__ == '__main__':
-    port = 5000
+    port = app.config['PORT']
     print(f"🌐 Starting SEO Keyword AI Agent v2.0 on http://localhost:{port}")
     print("💡 Available endpoints:")
     print("   - GET  /health")
@@ -463,4 +387,4 @@ if __name__ == '__main__':
     print("   - POST /batch-keywords (Multiple keywords)")
     print("🔧 Features: Ollama AI + SE Ranking API + N8N Integration")  # UPDATED
     print("🔑 SE Ranking API: Active")  # ADDED
-    app.run(host='0.0.0.0', port=port, debug=True)
+    app.run(host='0.0.0.0', port=port, debug=app.config['DEBUG'])
@@ -0,0 +1,107 @@
+"""Simple benchmarks for the SEO Keyword AI Agent.
+
+Usage:
+    python benchmarks.py                # run everything
+    python benchmarks.py cold_start     # run one benchmark
+"""
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Runs in a fresh interpreter so import and initialization costs are real.
+# Outbound HTTP is disabled so the numbers don't depend on Ollama / SE Ranking.
+COLD_START_SCRIPT = """
+import time
+t0 = time.perf_counter()
+import app
+t1 = time.perf_counter()
+client = app.app.test_client()
+assert client.get('/health').get_json()['providers_initialized'] == []
+t2 = time.perf_counter()
+import requests
+def offline(*args, **kwargs):
+    raise requests.ConnectionError('benchmark is offline')
+requests.get = requests.post = offline
+with app.app.app_context():
+    providers = app.get_providers()
+    providers.expander
+    providers.analyzer
+t3 = time.perf_counter()
+print(t1 - t0, t2 - t0, t3 - t2)
+"""
+
+
+def _report(name, samples):
+    samples_ms = [s * 1000 for s in samples]
+    print(f"   {name:<28} median {statistics.median(samples_ms):8.1f} ms"
+          f"   min {min(samples_ms):8.1f} ms   max {max(samples_ms):8.1f} ms")
+
+
+def bench_cold_start(runs=5):
+    """Time import, first /health response and lazy provider setup in new processes"""
+    imports, first_requests, providers = [], [], []
+    for _ in range(runs):
+        output = subprocess.run(
+            [sys.executable, '-c', COLD_START_SCRIPT],
+            cwd=BACKEND_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        import_time, first_request, provider_time = (float(v) for v in output.split())
+        imports.append(import_time)
+        first_requests.append(first_request)
+        providers.append(provider_time)
+
+    print(f"🧊 Cold start ({runs} runs)")
+    _report('import app', imports)
+    _report('first /health response', first_requests)
+    _report('lazy provider init', providers)
+
+
+def _synthetic_keywords(count, seed=42):
+    rng = random.Random(seed)
+    words = ['seo', 'marketing', 'best', 'cheap', 'buy', 'how to', 'near me', 'guide',
+             'tools', 'local', 'agency', 'course', 'for beginners', 'price', '2024']
+    return [' '.join(rng.choice(words) for _ in range(rng.randint(1, 5))) + f" {i}"
+            for i in range(count)]
+
+
+def bench_bulk_processing(count=1_000_000):
+    """Score, dedup and JSON-encode synthetic keywords with 1..N worker processes"""
+    from processing import BulkProcessor
+
+    keywords = _synthetic_keywords(count)
+    cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, cpus} | {w for w in (4, 8, 16) if w < cpus})
+
+    print(f"⚙️  Bulk processing {count:,} keywords ({cpus} CPUs)")
+    baseline = None
+    for workers in worker_counts:
+        processor = BulkProcessor(workers=workers)
+        if workers > 1:
+            processor.run(keywords[:workers * 1000])  # start the pool before timing
+        started = time.perf_counter()
+        result = processor.run(keywords, min_score=30, encode_json=True)
+        elapsed = time.perf_counter() - started
+        processor.close()
+
+        baseline = baseline or elapsed
+        print(f"   {workers:>3} worker(s)   {elapsed:8.2f} s   speedup {baseline / elapsed:5.2f}x"
+              f"   {len(result):,} kept")
+
+
+BENCHMARKS = {
+    'cold_start': bench_cold_start,
+    'bulk_processing': bench_bulk_processing
+}
+
+if __name__ == '__main__':
+    selected = sys.argv[1:] or list(BENCHMARKS)
+    for name in selected:
+        if name not in BENCHMARKS:
+            print(f"❌ Unknown benchmark '{name}'. Available: {', '.join(BENCHMARKS)}")
+            sys.exit(1)
+        BENCHMARKS[name]()
@@ -0,0 +1,278 @@
+"""Pluggable caches for Ollama expansions and SE Ranking metrics.
+
+MemoryCache keeps everything in the current process. SQLiteCache (WAL mode)
+shares one cache between workers on the same host, and RedisCache shares it
+across hosts. All of them offer get_or_compute, which makes sure only one
+worker computes a missing key while the others wait for its result.
+
+MemoryCache and SQLiteCache keep at most max_entries keys (SQLite trims on a
+periodic purge). RedisCache is bounded only by TTLs and the server's
+maxmemory policy.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+class CacheBackend:
+    """Interface for cache backends; values must be JSON serializable"""
+
+    # How long a worker may hold the compute lock for one key
+    lock_ttl = 60
+    poll_interval = 0.05
+    # How long a failed compute (None) is shared with waiters and new callers
+    failure_ttl = 5
+
+    def get(self, key):
+        raise NotImplementedError
+
+    def set(self, key, value, ttl=None):
+        raise NotImplementedError
+
+    def delete(self, key):
+        raise NotImplementedError
+
+    def _acquire(self, key):
+        """Try to take the compute lock for key; returns a token or None"""
+        raise NotImplementedError
+
+    def _release(self, key, token):
+        raise NotImplementedError
+
+    def get_or_compute(self, key, compute, ttl=None, wait_timeout=None):
+        """Return the cached value, or compute and store it exactly once.
+
+        If another worker is already computing the key, wait for its result
+        (up to wait_timeout, default lock_ttl) before computing it here too.
+        A compute() result of None is returned but not cached; instead a
+        short-lived failure marker makes waiters (and callers within
+        failure_ttl) return None rather than repeat the failing compute.
+        """
+        failed_key = f"failed:{key}"
+        value = self.get(key)
+        if value is not None or self.get(failed_key) is not None:
+            return value
+
+        wait_until = time.monotonic() + (wait_timeout if wait_timeout is not None else self.lock_ttl)
+        while True:
+            token = self._acquire(key)
+            if token is not None:
+                try:
+                    # Someone may have finished between our get and the lock
+                    value = self.get(key)
+                    if value is None and self.get(failed_key) is None:
+                        value = compute()
+                        if value is not None:
+                            self.set(key, value, ttl)
+                        else:
+                            self.set(failed_key, True, self.failure_ttl)
+                    return value
+                finally:
+                    self._release(key, token)
+
+            if time.monotonic() >= wait_until:
+                return compute()
+            time.sleep(self.poll_interval)
+            value = self.get(key)
+            if value is not None or self.get(failed_key) is not None:
+                return value
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache, the default and the stand-in for the shared ones"""
+
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() > expires_at:
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def _acquire(self, key):
+        with self._lock:
+            holder = self._locks.get(key)
+            if holder is not None and holder[1] > time.monotonic():
+                return None
+            token = uuid.uuid4().hex
+            self._locks[key] = (token, time.monotonic() + self.lock_ttl)
+            return token
+
+    def _release(self, key, token):
+        with self._lock:
+            holder = self._locks.get(key)
+            if holder is not None and holder[0] == token:
+                del self._locks[key]
+
+
+class SQLiteCache(CacheBackend):
+    """Cache in a SQLite file in WAL mode, shared by all workers on one host"""
+
+    # Seconds between purges of expired rows (and trims to max_entries)
+    purge_interval = 300
+
+    def __init__(self, path, max_entries=None):
+        self.path = path
+        self.max_entries = max_entries
+        self._next_purge = 0
+        self._local = threading.local()
+        conn = self._conn()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache (key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL)')
+        conn.execute('CREATE TABLE IF NOT EXISTS cache_locks (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)')
+
+    def _conn(self):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or getattr(self._local, 'pid', None) != os.getpid():
+            # One connection per thread, and a new one after a fork
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute('SELECT value, expires_at FROM cache WHERE key = ?', (key,)).fetchone()
+        if row is None:
+            return None
+        value, expires_at = row
+        if expires_at is not None and time.time() > expires_at:
+            self.delete(key)
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + ttl if ttl else None
+        self._conn().execute(
+            'INSERT OR REPLACE INTO cache (key, value, expires_at) VALUES (?, ?, ?)',
+            (key, json.dumps(value), expires_at)
+        )
+        if time.monotonic() >= self._next_purge:
+            self.purge()
+
+    def delete(self, key):
+        self._conn().execute('DELETE FROM cache WHERE key = ?', (key,))
+
+    def purge(self):
+        """Drop expired rows, then the ones closest to expiry beyond max_entries"""
+        self._next_purge = time.monotonic() + self.purge_interval
+        conn = self._conn()
+        now = time.time()
+        conn.execute('DELETE FROM cache WHERE expires_at < ?', (now,))
+        conn.execute('DELETE FROM cache_locks WHERE expires_at < ?', (now,))
+        if self.max_entries:
+            excess = conn.execute('SELECT COUNT(*) FROM cache').fetchone()[0] - self.max_entries
+            if excess > 0:
+                conn.execute(
+                    'DELETE FROM cache WHERE key IN '
+                    '(SELECT key FROM cache ORDER BY expires_at IS NULL, expires_at LIMIT ?)',
+                    (excess,)
+                )
+        # Fold the WAL back into the database so the -wal file stays small
+        conn.execute('PRAGMA wal_checkpoint(TRUNCATE)')
+
+    def _acquire(self, key):
+        token = uuid.uuid4().hex
+        conn = self._conn()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute('DELETE FROM cache_locks WHERE key = ? AND expires_at < ?', (key, time.time()))
+            cursor = conn.execute(
+                'INSERT OR IGNORE INTO cache_locks (key, token, expires_at) VALUES (?, ?, ?)',
+                (key, token, time.time() + self.lock_ttl)
+            )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return token if cursor.rowcount == 1 else None
+
+    def _release(self, key, token):
+        self._conn().execute('DELETE FROM cache_locks WHERE key = ? AND token = ?', (key, token))
+
+
+class RedisCache(CacheBackend):
+    """Cache on a Redis server (or anything speaking the Redis protocol)"""
+
+    def __init__(self, url='redis://localhost:6379/0', prefix='seo-agent:', client=None):
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise ImportError("RedisCache needs the 'redis' package: pip install redis")
+            client = redis.Redis.from_url(url)
+        self.client = client
+        self.prefix = prefix
+
+    def get(self, key):
+        value = self.client.get(self.prefix + key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self.client.set(self.prefix + key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    def delete(self, key):
+        self.client.delete(self.prefix + key)
+
+    def _acquire(self, key):
+        token = uuid.uuid4().hex
+        if self.client.set(f"{self.prefix}lock:{key}", token, nx=True, ex=self.lock_ttl):
+            return token
+        return None
+
+    def _release(self, key, token):
+        # Delete the lock only if we still own it; WATCH/MULTI instead of a
+        # Lua script so servers without EVAL work too
+        lock_key = f"{self.prefix}lock:{key}"
+        with self.client.pipeline() as pipe:
+            try:
+                pipe.watch(lock_key)
+                holder = pipe.get(lock_key)
+                # bytes by default, str for clients with decode_responses=True
+                if isinstance(holder, bytes):
+                    holder = holder.decode()
+                if holder == token:
+                    pipe.multi()
+                    pipe.delete(lock_key)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except Exception as e:
+                # Lost the race to an expiry; the lock is no longer ours
+                print(f"⚠️  Cache lock release for '{key}' skipped: {e}")
+
+def create_cache(backend='memory', url='', max_entries=10000):
+    """Build the cache backend named in the config"""
+    if backend == 'memory':
+        return MemoryCache(max_entries)
+    if backend == 'sqlite':
+        return SQLiteCache(url or 'seo_agent_cache.db', max_entries)
+    if backend == 'redis':
+        return RedisCache(url or 'redis://localhost:6379/0')
+    raise ValueError(f"Unknown cache backend: {backend}")
@@ -0,0 +1,72 @@
+import json
+import os
+
+# Every setting can be overridden by an environment variable of the same name
+# or by a JSON config file pointed to by SEO_AGENT_CONFIG.
+DEFAULTS = {
+    'OLLAMA_URL': 'http://localhost:11434',
+    'OLLAMA_MODEL': 'mistral',
+    'SE_RANKING_API_KEY': '',
+    'SE_RANKING_BASE_URL': 'https://api4.seranking.com',
+    'SE_RANKING_MAX_WORKERS': 8,
+    'SE_RANKING_TIMEOUT': 15.0,
+    'SE_RANKING_HEDGE': False,
+    # Default per-request deadline in seconds, 0 means none
+    'REQUEST_TIMEOUT': 0.0,
+    'GRAPH_PARALLELISM': 4,
+    # Cache for expansions and metrics: memory, sqlite (CACHE_URL is a file
+    # path) or redis (CACHE_URL like redis://localhost:6379/0)
+    'CACHE_BACKEND': 'memory',
+    'CACHE_URL': '',
+    'CACHE_TTL': 86400,
+    # Max entries for the memory and sqlite backends; redis relies on TTLs
+    'METRICS_CACHE_SIZE': 10000,
+    # Process pool for bulk scoring, 0 or 1 keeps it in the request thread
+    'PROCESS_POOL_WORKERS': 0,
+    'BULK_CHUNK_SIZE': 50000,
+    'RESULT_CACHE_SIZE': 100,
+    'RESULT_CACHE_TTL': 900,
+    'PORT': 5000,
+    'DEBUG': True
+}
+
+
+def _coerce(value, default):
+    """Convert a string from the environment to the type of the default"""
+    if not isinstance(value, str):
+        return value
+    if isinstance(default, bool):
+        return value.strip().lower() in ('1', 'true', 'yes', 'on')
+    if isinstance(default, int):
+        return int(value)
+    if isinstance(default, float):
+        return float(value)
+    return value
+
+
+def load_config(path=None, overrides=None):
+    """Build the settings dict: defaults < config file < environment < overrides"""
+    try:
+        from dotenv import load_dotenv
+        load_dotenv()
+    except ImportError:
+        pass
+
+    config = dict(DEFAULTS)
+
+    path = path or os.getenv('SEO_AGENT_CONFIG')
+    if path:
+        with open(path) as f:
+            config.update(json.load(f))
+
+    for key, default in DEFAULTS.items():
+        if key in os.environ:
+            config[key] = _coerce(os.environ[key], default)
+
+    if overrides:
+        config.update(overrides)
+
+    for key, default in DEFAULTS.items():
+        config[key] = _coerce(config[key], default)
+
+    return config
@@ -0,0 +1,95 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+
+class DeadlineExceeded(Exception):
+    """Raised when there is no time budget left for another provider call"""
+
+
+class Deadline:
+    """A point in time by which the whole request must be answered"""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.expires_at = time.monotonic() + seconds
+
+    def remaining(self):
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cancel(self):
+        """Expire now, so calls still running with this deadline stop early"""
+        self.expires_at = time.monotonic()
+
+    def timeout(self, default):
+        """Timeout for the next call: the provider default, capped by the remaining budget"""
+        remaining = self.remaining()
+        if remaining <= 0:
+            raise DeadlineExceeded(f"Deadline of {self.seconds}s exceeded")
+        return min(default, remaining)
+
+
+def call_timeout(deadline, default):
+    return deadline.timeout(default) if deadline is not None else default
+
+
+class LatencyTracker:
+    """Rolling window of call latencies used to pick the hedging delay"""
+
+    def __init__(self, window=200, min_samples=20):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, seconds):
+        with self._lock:
+            self._samples.append(seconds)
+
+    def percentile(self, pct):
+        """Return the pct-th percentile, or None until there are enough samples"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(len(ordered) * pct / 100))
+        return ordered[index]
+
+
+def hedged_call(pool, fn, delay, timeout):
+    """Run fn, and if it hasn't answered after delay seconds run a duplicate.
+
+    Whichever call succeeds first wins. The loser keeps running in the pool
+    until its own timeout, but its result is ignored. Raises the last error,
+    or TimeoutError if neither call answered within timeout; attempts still
+    queued in the pool at that point are cancelled so they never start.
+    """
+    started = time.monotonic()
+    first = pool.submit(fn)
+    done, _ = wait([first], timeout=delay)
+    if done:
+        return first.result()
+
+    pending = {first, pool.submit(fn)}
+    error = None
+    while pending:
+        remaining = timeout - (time.monotonic() - started)
+        if remaining <= 0:
+            break
+        done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+        for future in done:
+            try:
+                return future.result()
+            except Exception as e:
+                error = e
+
+    for future in pending:
+        future.cancel()
+    if error is not None:
+        raise error
+    # A plain timeout, like an unhedged call; callers decide whether the
+    # request deadline has actually passed
+    raise TimeoutError(f"No response within {timeout:.2f}s")
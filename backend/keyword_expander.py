@@ -1,125 +1,147 @@
 import requests
-import re
+from deadlines import DeadlineExceeded, call_timeout
+from processing import clean_keywords
 
 class KeywordExpander:
-    def __init__(self):
-        self.ollama_url = "http://localhost:11434/api/generate"
-        self.model = "mistral"
+    def __init__(self, ollama_url="http://localhost:11434", model="mistral", cache=None, cache_ttl=86400):
+        self.base_url = ollama_url.rstrip('/')
+        self.ollama_url = f"{self.base_url}/api/generate"
+        self.model = model
+        # Optional shared cache of AI expansions (see cache_backends.py)
+        self.cache = cache
+        self.cache_ttl = cache_ttl
         
-    def expand(self, seed_keyword):
+    def expand(self, seed_keyword, deadline=None):
+        if self.cache is None:
+            keywords = self._expand_with_ollama(seed_keyword, deadline)
+        else:
+            key = f"expand:{self.model}:{' '.join(seed_keyword.lower().split())}"
+            keywords = self.cache.get_or_compute(
+                key, lambda: self._expand_with_ollama(seed_keyword, deadline), self.cache_ttl,
+                wait_timeout=deadline.remaining() if deadline else None
+            )
+        
+        # Mock data is never cached, so expansions pick up Ollama once it is back
+        if keywords is None:
+            return self._generate_mock_keywords(seed_keyword)
+        return keywords
+    
+    def _expand_with_ollama(self, seed_keyword, deadline=None):
+        """Ask Ollama for keyword variations; returns None when it is unavailable"""
         try:
             # Check if Ollama is running
             try:
-                response = requests.get("http://localhost:11434/api/tags", timeout=5)
+                response = requests.get(f"{self.base_url}/api/tags", timeout=call_timeout(deadline, 5))
                 if response.status_code != 200:
                     print("⚠️  Ollama not running. Using mock data.")
-                    return self._generate_mock_keywords(seed_keyword)
+                    return None
+            except DeadlineExceeded:
+                raise
             except:
+                if deadline is not None and deadline.expired():
+                    raise DeadlineExceeded('Deadline reached while checking Ollama')
                 print("⚠️  Cannot connect to Ollama. Using mock data.")
-                return self._generate_mock_keywords(seed_keyword)
+                return None
             
             prompt = f"""
-            Generate 150 SEO keyword variations for "{seed_keyword}". Return ONLY a comma-separated list.
-
-            Include these types:
-            - Long-tail keywords (3-5 words)
-            - Question-based keywords (how, what, why, when)
-            - Geographic variations (cities, countries)
-            - "Near me" and local keywords
-            - Comparison keywords (vs, alternatives, best)
-            - Price and cost related
-            - Review and rating keywords
-            - Beginner/friendly keywords
-            - 2024/2025 trend keywords
-
-            Example for "coffee shop": best coffee shops near me, how to start a coffee shop, coffee shop business plan, affordable coffee machines
-
-            Now generate for: "{seed_keyword}"
+            Generate SEO keyword variations for "{seed_keyword}". Return ONLY a comma-separated list.
+            Include: long-tail keywords, question-based, geographic variations, comparison keywords.
+            Example: best {seed_keyword}, how to {seed_keyword}, {seed_keyword} near me
             """
             
             data = {
                 "model": self.model,
                 "prompt": prompt,
                 "stream": False,
-                "options": {
-                    "temperature": 0.7,
-                    "num_predict": 1000
-                }
+                "options": {"temperature": 0.7}
             }
             
-            response = requests.post(self.ollama_url, json=data, timeout=60)
+            response = requests.post(self.ollama_url, json=data, timeout=call_timeout(deadline, 30))
             
             if response.status_code == 200:
                 result = response.json()
                 keywords_text = result["response"].strip()
                 
-                # Clean the response
-                keywords_text = re.sub(r'^\d+\.\s*', '', keywords_text, flags=re.MULTILINE)
-                keywords_text = re.sub(r'["\']', '', keywords_text)
-                
-                # Split by commas and newlines
-                keywords = []
-                for line in keywords_text.split('\n'):
-                    for kw in line.split(','):
-                        clean_kw = kw.strip()
-                        if clean_kw and len(clean_kw) > 2:
-                            keywords.append(clean_kw)
+                # Clean the response and split by commas and newlines
+                keywords = clean_keywords(keywords_text)
                 
                 unique_keywords = list(set(keywords))
                 print(f"✅ AI generated {len(unique_keywords)} keywords")
-                return unique_keywords[:100]
+                return unique_keywords[:50]
                 
             else:
                 print("❌ Ollama API error. Using mock data.")
-                return self._generate_mock_keywords(seed_keyword)
+                return None
                 
+        except DeadlineExceeded:
+            print("⏱️  Deadline reached before Ollama answered. Using mock data.")
+            return None
         except Exception as e:
-            print(f"❌ Error: {e}. Using mock data.")
-            return self._generate_mock_keywords(seed_keyword)
+            # A timeout cut short by the deadline is not an Ollama failure
+            if deadline is not None and deadline.expired():
+                print("⏱️  Deadline reached before Ollama answered. Using mock data.")
+            else:
+                print(f"❌ Error: {e}. Using mock data.")
+            return None
     
     def _generate_mock_keywords(self, seed_keyword):
-        """Generate mock keywords when Ollama is not available"""
+        """Generate exactly 50 mock keywords when Ollama is not available"""
         patterns = [
-            f"best {seed_keyword}",
-            f"how to {seed_keyword}",
-            f"{seed_keyword} for beginners",
-            f"affordable {seed_keyword}",
-            f"{seed_keyword} near me",
-            f"{seed_keyword} 2024",
-            f"why {seed_keyword} is important",
-            f"{seed_keyword} vs alternatives",
-            f"free {seed_keyword}",
-            f"professional {seed_keyword}",
-            f"{seed_keyword} tips and tricks",
-            f"{seed_keyword} best practices",
-            f"how much does {seed_keyword} cost",
-            f"{seed_keyword} reviews",
-            f"is {seed_keyword} worth it",
-            f"learn {seed_keyword} online",
-            f"{seed_keyword} course",
-            f"{seed_keyword} tutorial",
-            f"what is {seed_keyword}",
-            f"benefits of {seed_keyword}",
-            f"{seed_keyword} guide",
-            f"{seed_keyword} strategies",
-            f"{seed_keyword} tools",
-            f"{seed_keyword} software",
-            f"{seed_keyword} services",
-            f"top 10 {seed_keyword}",
-            f"{seed_keyword} ideas",
-            f"{seed_keyword} examples",
-            f"{seed_keyword} techniques",
-            f"{seed_keyword} for small business"
+            # Basic variations
+            f"best {seed_keyword}", f"how to {seed_keyword}", f"{seed_keyword} for beginners",
+            f"affordable {seed_keyword}", f"{seed_keyword} near me", f"{seed_keyword} 2024",
+            f"free {seed_keyword}", f"professional {seed_keyword}", f"{seed_keyword} tips",
+            f"{seed_keyword} course", f"{seed_keyword} tutorial", f"what is {seed_keyword}",
+            f"learn {seed_keyword}", f"{seed_keyword} guide", f"{seed_keyword} tools",
+            
+            # Strategy and techniques
+            f"{seed_keyword} strategies", f"{seed_keyword} techniques", f"{seed_keyword} examples",
+            f"{seed_keyword} ideas", f"{seed_keyword} plan", f"{seed_keyword} checklist",
+            f"{seed_keyword} template", f"{seed_keyword} software", f"{seed_keyword} platform",
+            f"{seed_keyword} agency", f"{seed_keyword} consultant", f"{seed_keyword} expert",
+            
+            # Services and solutions
+            f"{seed_keyword} services", f"{seed_keyword} solutions", f"{seed_keyword} company",
+            f"{seed_keyword} trends 2024", f"{seed_keyword} statistics", f"{seed_keyword} data",
+            f"{seed_keyword} analysis", f"{seed_keyword} report", f"{seed_keyword} case study",
+            
+            # Success and benefits
+            f"{seed_keyword} success stories", f"{seed_keyword} benefits", f"{seed_keyword} advantages",
+            f"{seed_keyword} vs traditional marketing", f"{seed_keyword} best practices",
+            f"{seed_keyword} for small business", f"{seed_keyword} for startups",
+            
+            # Specific use cases
+            f"{seed_keyword} for ecommerce", f"{seed_keyword} for local business",
+            f"{seed_keyword} on a budget", f"{seed_keyword} without spending money",
+            f"{seed_keyword} quick start", f"{seed_keyword} step by step",
+            f"{seed_keyword} ultimate guide", f"{seed_keyword} complete course",
+            
+            # Question-based
+            f"how to start {seed_keyword}", f"why {seed_keyword} is important",
+            f"when to use {seed_keyword}", f"where to learn {seed_keyword}",
+            f"which {seed_keyword} tools are best", f"what is the cost of {seed_keyword}",
+            f"is {seed_keyword} worth it", f"how much does {seed_keyword} cost",
+            
+            # Comparison keywords
+            f"{seed_keyword} vs social media marketing", f"{seed_keyword} alternatives",
+            f"{seed_keyword} compared to", f"best {seed_keyword} strategies",
+            
+            # Geographic variations
+            f"{seed_keyword} in new york", f"{seed_keyword} services london",
+            f"best {seed_keyword} los angeles", f"{seed_keyword} near me",
+            f"{seed_keyword} in usa", f"{seed_keyword} uk", f"{seed_keyword} australia",
+            
+            # Advanced topics
+            f"advanced {seed_keyword}", f"{seed_keyword} masterclass",
+            f"{seed_keyword} certification", f"{seed_keyword} training",
+            f"{seed_keyword} workshop", f"{seed_keyword} webinar",
+            
+            # Additional patterns to reach 50
+            f"effective {seed_keyword}", f"successful {seed_keyword}",
+            f"proven {seed_keyword} methods", f"{seed_keyword} optimization",
+            f"{seed_keyword} management", f"{seed_keyword} automation"
         ]
         
-        # Add geographic variations
-        cities = ["new york", "london", "tokyo", "dubai", "sydney", "paris", "berlin"]
-        for city in cities:
-            patterns.extend([
-                f"{seed_keyword} in {city}",
-                f"best {seed_keyword} {city}",
-                f"{city} {seed_keyword} services",
-                f"{seed_keyword} near {city}"
-            ])
-        
-        return list(set(patterns))[:80]
\ No newline at end of file
+        # Ensure we have exactly 50 unique keywords
+        unique_patterns = list(set(patterns))
+        return unique_patterns[:50]  # Return exactly 50 keywords
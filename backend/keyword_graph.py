@@ -0,0 +1,126 @@
+import heapq
+import itertools
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from deadlines import Deadline
+from processing import keyword_hash
+
+
+class SeenSet:
+    """Visited keywords stored as 8-byte hashes instead of full strings"""
+
+    def __init__(self):
+        self._hashes = set()
+
+    def add(self, keyword):
+        """Mark keyword as visited; returns False if it was already seen"""
+        key = keyword_hash(keyword)
+        if key in self._hashes:
+            return False
+        self._hashes.add(key)
+        return True
+
+    def __contains__(self, keyword):
+        return keyword_hash(keyword) in self._hashes
+
+    def __len__(self):
+        return len(self._hashes)
+
+
+class KeywordGraphExplorer:
+    """Recursive best-first keyword expansion built on expand() and analyze().
+
+    Every analyzed keyword is a node; the keyword it was expanded from is its
+    parent. The frontier is a priority queue ordered by opportunity score, so
+    the most promising keywords are expanded again first.
+    """
+
+    def __init__(self, expander, analyzer, parallelism=4):
+        self.expander = expander
+        self.analyzer = analyzer
+        self.parallelism = parallelism
+
+    def explore(self, seed_keyword, max_depth=2, max_nodes=200, time_budget=60, min_score=None):
+        """Yield graph events as the graph grows.
+
+        Events are {'type': 'node', ...} for every analyzed keyword and a final
+        {'type': 'done', ...} with the totals and which budget stopped the run.
+        """
+        deadline = Deadline(time_budget)
+        seen = SeenSet()
+        seen.add(seed_keyword)
+        counter = itertools.count()
+
+        # Frontier entries are (-score, tie breaker, keyword, depth)
+        frontier = [(float('-inf'), next(counter), seed_keyword, 0)]
+        node_count = 0
+        expanded_count = 0
+        stopped_by = 'exhausted'
+
+        yield {'type': 'node', 'keyword': seed_keyword, 'parent': None, 'depth': 0}
+
+        pool = ThreadPoolExecutor(max_workers=self.parallelism)
+        running = {}
+        try:
+            while frontier or running:
+                if deadline.expired():
+                    stopped_by = 'time'
+                    break
+                if node_count >= max_nodes:
+                    stopped_by = 'nodes'
+                    break
+
+                # Keep up to `parallelism` of the best frontier nodes in flight
+                while frontier and len(running) < self.parallelism:
+                    _, _, keyword, depth = heapq.heappop(frontier)
+                    if depth >= max_depth:
+                        stopped_by = 'depth'
+                        continue
+                    future = pool.submit(self._expand_node, keyword, deadline, min_score, seen,
+                                         max_nodes - node_count)
+                    running[future] = (keyword, depth)
+
+                if not running:
+                    continue
+
+                done, _ = wait(running, timeout=deadline.remaining(), return_when=FIRST_COMPLETED)
+                for future in done:
+                    parent, depth = running.pop(future)
+                    expanded_count += 1
+                    children = sorted(future.result(), key=lambda x: x['opportunity_score'], reverse=True)
+                    for child in children:
+                        if node_count >= max_nodes:
+                            break
+                        # Sorted, so everything after this is below the cutoff too
+                        if min_score is not None and child['opportunity_score'] < min_score:
+                            break
+                        if not seen.add(child['keyword']):
+                            continue
+                        node_count += 1
+                        heapq.heappush(frontier, (-child['opportunity_score'], next(counter), child['keyword'], depth + 1))
+                        yield dict(child, type='node', parent=parent, depth=depth + 1)
+        finally:
+            # Queued nodes are cancelled; running ones see the expired
+            # deadline and stop before their next SE Ranking lookup
+            deadline.cancel()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+        yield {
+            'type': 'done',
+            'seed_keyword': seed_keyword,
+            'total_nodes': node_count,
+            'expanded_nodes': expanded_count,
+            'visited': len(seen),
+            'stopped_by': stopped_by
+        }
+
+    def _expand_node(self, keyword, deadline, min_score, seen, budget):
+        if deadline.expired():
+            return []
+        # Skip lookups for keywords already in the graph; the final dedup
+        # still happens on the scheduling thread
+        expanded = [kw for kw in self.expander.expand(keyword, deadline) if kw not in seen]
+        if deadline.expired():
+            return []
+        # No point paying for more lookups than the graph has node slots left
+        return self.analyzer.analyze(expanded, min_score=min_score, deadline=deadline, max_results=budget)
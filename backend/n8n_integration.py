@@ -0,0 +1,16 @@
+# N8N Webhook Integration
+class N8NIntegration:
+    @staticmethod
+    def process_n8n_webhook(data):
+        """Process incoming webhook requests from N8N"""
+        try:
+            keyword = data.get('keyword', '').strip()
+            if not keyword:
+                return {'error': 'No keyword provided'}, 400
+                
+            # You can add additional N8N-specific processing here
+            # For example: logging, rate limiting, custom formatting
+            
+            return {'status': 'success', 'keyword_received': keyword}, 200
+        except Exception as e:
+            return {'error': str(e)}, 500
@@ -0,0 +1,347 @@
+"""CPU-bound keyword processing: cleanup, estimation, scoring, dedup and JSON.
+
+The functions at the top are the single source of truth used by the expander
+and analyzer. BulkProcessor runs the same steps over large keyword lists,
+optionally spread across a process pool.
+"""
+import hashlib
+import heapq
+import json
+import random
+import re
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+
+COMMERCIAL_TERMS = ['buy', 'price', 'cost', 'deal', 'discount', 'cheap', 'sale']
+
+
+def clean_keywords(text):
+    """Turn raw LLM output (numbered lines, quotes, commas) into a keyword list"""
+    text = re.sub(r'^\d+\.\s*', '', text, flags=re.MULTILINE)
+    text = re.sub(r'["\']', '', text)
+
+    # Split by commas and newlines
+    keywords = []
+    for line in text.split('\n'):
+        for kw in line.split(','):
+            clean_kw = kw.strip()
+            if clean_kw and len(clean_kw) > 2:
+                keywords.append(clean_kw)
+    return keywords
+
+
+def keyword_hash(keyword):
+    """Stable 64-bit hash of the normalized keyword, the same in every process"""
+    normalized = ' '.join(keyword.lower().split())
+    return int.from_bytes(hashlib.blake2b(normalized.encode(), digest_size=8).digest(), 'big', signed=True)
+
+
+def estimate_metrics(keyword):
+    """Enhanced estimation when API is unavailable"""
+    word_count = len(keyword.split())
+    keyword_lower = keyword.lower()
+
+    # Volume estimation based on keyword characteristics
+    base_volume = 1000
+
+    # Adjust volume based on keyword intent
+    if any(term in keyword_lower for term in ['how to', 'what is', 'why', 'tutorial']):
+        base_volume = 2500  # Informational queries
+    elif any(term in keyword_lower for term in ['buy', 'price', 'cost', 'for sale']):
+        base_volume = 1800  # Commercial intent
+    elif any(term in keyword_lower for term in ['near me', 'local', 'city']):
+        base_volume = 1200  # Local intent
+
+    # Long-tail keywords have lower volume
+    if word_count > 3:
+        base_volume = max(100, base_volume // (word_count - 1))
+
+    # Competition estimation
+    if word_count <= 2:
+        competition = random.randint(75, 95)  # High competition for short keywords
+    elif word_count == 3:
+        competition = random.randint(45, 75)  # Medium competition
+    else:
+        competition = random.randint(15, 45)  # Low competition for long-tail
+
+    # Adjust competition for commercial terms
+    if any(term in keyword_lower for term in COMMERCIAL_TERMS):
+        competition = min(95, competition + 20)
+
+    # CPC estimation (Cost Per Click)
+    cpc = max(0.5, competition / 50)  # Higher competition = higher CPC
+
+    return base_volume, competition, round(cpc, 2)
+
+
+def score_upper_bound(keyword):
+    """Best opportunity score estimate_metrics can give a keyword.
+
+    Only a bound for estimated data; real API metrics can score higher.
+    """
+    # Assume maximum volume and CPC, and the lowest competition the
+    # estimation heuristic would give a keyword of this length
+    word_count = len(keyword.split())
+    if word_count <= 2:
+        min_competition = 75
+    elif word_count == 3:
+        min_competition = 45
+    else:
+        min_competition = 15
+
+    if any(term in keyword.lower() for term in COMMERCIAL_TERMS):
+        min_competition = min(95, min_competition + 20)
+
+    return opportunity_score(10000, min_competition, 10)
+
+
+def opportunity_score(volume, competition, cpc):
+    """Calculate opportunity score considering volume, competition, and CPC"""
+    # Normalize volume (0-1 scale)
+    volume_score = min(volume / 10000, 1.0)
+
+    # Invert competition (lower competition = higher score)
+    competition_score = 1 - (competition / 100)
+
+    # CPC indicates commercial value (higher CPC = more valuable)
+    cpc_score = min(cpc / 10, 1.0)
+
+    # Weighted combination (40% volume, 40% competition, 20% CPC value)
+    score = (volume_score * 0.4) + (competition_score * 0.4) + (cpc_score * 0.2)
+
+    return round(score * 100, 2)
+
+
+def difficulty_label(competition):
+    if competition < 30:
+        return "Very Easy"
+    elif competition < 50:
+        return "Easy"
+    elif competition < 70:
+        return "Medium"
+    elif competition < 85:
+        return "Hard"
+    else:
+        return "Very Hard"
+
+
+# --- Bulk processing -------------------------------------------------------
+#
+# Keywords travel to workers as one UTF-8 buffer in shared memory; each task
+# only carries the buffer name and a byte range. Results come back columnar:
+# the kept keywords as one newline-joined string plus packed arrays for the
+# metrics, so nothing is pickled per keyword.
+
+COLUMNS = (('hashes', 'q'), ('volumes', 'i'), ('competitions', 'b'), ('cpcs', 'd'), ('scores', 'd'))
+
+
+def _split_keywords(text, raw):
+    """Raw LLM-style text gets the full cleanup; list input is one keyword per line"""
+    if raw:
+        return clean_keywords(text)
+    return [line.strip() for line in text.split('\n') if line.strip()]
+
+
+def _score_text(text, raw=True):
+    """Clean, dedup, estimate and score one chunk of keyword text"""
+    columns = {name: array(code) for name, code in COLUMNS}
+    kept = []
+    seen = set()
+    for keyword in _split_keywords(text, raw):
+        key = keyword_hash(keyword)
+        if key in seen:
+            continue
+        seen.add(key)
+        volume, competition, cpc = estimate_metrics(keyword)
+        kept.append(keyword)
+        columns['hashes'].append(key)
+        columns['volumes'].append(volume)
+        columns['competitions'].append(competition)
+        columns['cpcs'].append(cpc)
+        columns['scores'].append(opportunity_score(volume, competition, cpc))
+    return '\n'.join(kept), {name: col.tobytes() for name, col in columns.items()}
+
+
+def _score_shared_chunk(shm_name, start, end, raw):
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        text = bytes(shm.buf[start:end]).decode()
+    finally:
+        shm.close()
+    return _score_text(text, raw)
+
+
+def _attach_worker():
+    # Workers only attach to buffers the parent owns; keep the resource
+    # tracker from treating them as leaks when a worker exits
+    def register(name, rtype):
+        if rtype != 'shared_memory':
+            _register(name, rtype)
+    _register = resource_tracker.register
+    resource_tracker.register = register
+
+
+def _encode_chunk(text, columns, mask):
+    """NDJSON for the selected keywords of one chunk"""
+    chunk = BulkChunk(text, columns)
+    lines = [json.dumps(chunk.record(i)) for i in range(len(chunk)) if mask[i]]
+    return ('\n'.join(lines) + '\n').encode() if lines else b''
+
+
+class BulkChunk:
+    """Columnar results for one chunk of keywords"""
+
+    def __init__(self, text, columns):
+        self.text = text
+        self.columns = {}
+        for name, code in COLUMNS:
+            col = array(code)
+            col.frombytes(columns[name])
+            self.columns[name] = col
+        self._keywords = None
+
+    def __len__(self):
+        return len(self.columns['hashes'])
+
+    @property
+    def keywords(self):
+        if self._keywords is None:
+            self._keywords = self.text.split('\n') if self.text else []
+        return self._keywords
+
+    def record(self, i):
+        competition = self.columns['competitions'][i]
+        return {
+            'keyword': self.keywords[i],
+            'monthly_volume': self.columns['volumes'][i],
+            'competition': competition,
+            'cpc': round(self.columns['cpcs'][i], 2),
+            'opportunity_score': round(self.columns['scores'][i], 2),
+            'difficulty': difficulty_label(competition),
+            'data_source': 'Estimated (Bulk)'
+        }
+
+    def packed(self):
+        return {name: col.tobytes() for name, col in self.columns.items()}
+
+
+class BulkResult:
+    def __init__(self, chunks, masks, json_lines=None):
+        self.chunks = chunks
+        self.masks = masks
+        self.json_lines = json_lines
+
+    def __len__(self):
+        return sum(sum(mask) for mask in self.masks)
+
+    def top(self, k):
+        """Best k keywords by opportunity score, building dicts only for those"""
+        candidates = (
+            (chunk.columns['scores'][i], c, i)
+            for c, (chunk, mask) in enumerate(zip(self.chunks, self.masks))
+            for i in range(len(chunk)) if mask[i]
+        )
+        best = heapq.nlargest(k, candidates)
+        return [self.chunks[c].record(i) for _, c, i in best]
+
+
+class BulkProcessor:
+    """Runs cleanup, estimation, scoring, dedup and JSON encoding over large
+    keyword lists. With workers > 1 the chunks are spread over a process pool.
+    """
+
+    def __init__(self, workers=0, chunk_size=50000):
+        self.workers = workers
+        self.chunk_size = chunk_size
+        self._pool = None
+
+    def _get_pool(self):
+        if self._pool is None:
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach_worker)
+        return self._pool
+
+    def close(self):
+        if self._pool is not None:
+            self._pool.shutdown()
+            self._pool = None
+
+    def run(self, keywords, min_score=None, difficulty=None, encode_json=False):
+        """Process a keyword list (or raw newline/comma separated text).
+
+        Raw text goes through clean_keywords like Ollama output; list items
+        are taken as they are, commas and quotes included. Metrics come from
+        estimate_metrics, which is randomized, so scores differ between runs.
+        """
+        raw = isinstance(keywords, str)
+        if raw:
+            text = keywords
+        else:
+            text = '\n'.join(' '.join(kw.split()) for kw in keywords)
+        buf = text.encode()
+        ranges = self._chunk_ranges(buf)
+
+        if self.workers > 1 and len(ranges) > 1:
+            chunks = self._run_pool(buf, ranges, raw)
+        else:
+            chunks = [BulkChunk(*_score_text(buf[start:end].decode(), raw)) for start, end in ranges]
+
+        # Dedup across chunks and apply the score and difficulty filters
+        wanted = {d.strip().lower() for d in difficulty} if difficulty else None
+        seen = set()
+        masks = []
+        for chunk in chunks:
+            mask = bytearray(len(chunk))
+            scores = chunk.columns['scores']
+            competitions = chunk.columns['competitions']
+            for i, key in enumerate(chunk.columns['hashes']):
+                if key in seen or (min_score is not None and scores[i] < min_score):
+                    continue
+                if wanted is not None and difficulty_label(competitions[i]).lower() not in wanted:
+                    continue
+                seen.add(key)
+                mask[i] = 1
+            masks.append(mask)
+
+        json_lines = None
+        if encode_json:
+            if self.workers > 1 and len(chunks) > 1:
+                pool = self._get_pool()
+                futures = [pool.submit(_encode_chunk, chunk.text, chunk.packed(), bytes(mask))
+                           for chunk, mask in zip(chunks, masks)]
+                json_lines = b''.join(f.result() for f in futures)
+            else:
+                json_lines = b''.join(_encode_chunk(chunk.text, chunk.packed(), mask)
+                                      for chunk, mask in zip(chunks, masks))
+
+        return BulkResult(chunks, masks, json_lines)
+
+    def _chunk_ranges(self, buf):
+        """Byte ranges of roughly chunk_size keywords, split on newlines"""
+        if not buf:
+            return []
+        approx_keywords = buf.count(b'\n') + 1
+        n_chunks = max(1, -(-approx_keywords // self.chunk_size))
+        if self.workers > 1:
+            n_chunks = max(n_chunks, self.workers)
+        step = len(buf) // n_chunks + 1
+
+        ranges = []
+        start = 0
+        while start < len(buf):
+            end = buf.find(b'\n', start + step)
+            end = len(buf) if end == -1 else end + 1
+            ranges.append((start, end))
+            start = end
+        return ranges
+
+    def _run_pool(self, buf, ranges, raw):
+        shm = shared_memory.SharedMemory(create=True, size=len(buf))
+        try:
+            shm.buf[:len(buf)] = buf
+            pool = self._get_pool()
+            futures = [pool.submit(_score_shared_chunk, shm.name, start, end, raw) for start, end in ranges]
+            return [BulkChunk(*f.result()) for f in futures]
+        finally:
+            shm.close()
+            shm.unlink()
@@ -0,0 +1,103 @@
+import threading
+
+from ranking import ResultCache
+
+
+class Providers:
+    """Creates the expander, analyzer and caches on first use.
+
+    Nothing here is built at import time, so a worker that only serves
+    /health never pays for the provider modules or their HTTP clients.
+    """
+
+    NAMES = ('cache', 'expander', 'analyzer', 'graph_explorer', 'bulk_processor', 'n8n_integration', 'result_cache')
+
+    def __init__(self, config):
+        self.config = config
+        self._instances = {}
+        self._lock = threading.RLock()
+
+    def _get(self, name, factory):
+        instance = self._instances.get(name)
+        if instance is None:
+            with self._lock:
+                instance = self._instances.get(name)
+                if instance is None:
+                    instance = factory()
+                    self._instances[name] = instance
+        return instance
+
+    def is_initialized(self, name):
+        return name in self._instances
+
+    def initialized(self):
+        """Names of the providers built so far, without building any"""
+        return [name for name in self.NAMES if self.is_initialized(name)]
+
+    @property
+    def cache(self):
+        return self._get('cache', self._build_cache)
+
+    @property
+    def expander(self):
+        return self._get('expander', self._build_expander)
+
+    @property
+    def analyzer(self):
+        return self._get('analyzer', self._build_analyzer)
+
+    @property
+    def graph_explorer(self):
+        return self._get('graph_explorer', self._build_graph_explorer)
+
+    @property
+    def bulk_processor(self):
+        return self._get('bulk_processor', self._build_bulk_processor)
+
+    @property
+    def n8n_integration(self):
+        return self._get('n8n_integration', self._build_n8n_integration)
+
+    @property
+    def result_cache(self):
+        return self._get('result_cache', self._build_result_cache)
+
+    def _build_cache(self):
+        from cache_backends import create_cache
+        return create_cache(self.config['CACHE_BACKEND'], self.config['CACHE_URL'], self.config['METRICS_CACHE_SIZE'])
+
+    def _build_expander(self):
+        from keyword_expander import KeywordExpander
+        return KeywordExpander(
+            self.config['OLLAMA_URL'], self.config['OLLAMA_MODEL'],
+            cache=self.cache, cache_ttl=self.config['CACHE_TTL']
+        )
+
+    def _build_analyzer(self):
+        from se_ranking_analyzer import SERankingAnalyzer
+        return SERankingAnalyzer(
+            api_key=self.config['SE_RANKING_API_KEY'],
+            base_url=self.config['SE_RANKING_BASE_URL'],
+            max_workers=self.config['SE_RANKING_MAX_WORKERS'],
+            cache=self.cache,
+            cache_ttl=self.config['CACHE_TTL'],
+            request_timeout=self.config['SE_RANKING_TIMEOUT'],
+            hedge=self.config['SE_RANKING_HEDGE']
+        )
+
+    def _build_graph_explorer(self):
+        from keyword_graph import KeywordGraphExplorer
+        return KeywordGraphExplorer(self.expander, self.analyzer, self.config['GRAPH_PARALLELISM'])
+
+    def _build_bulk_processor(self):
+        from processing import BulkProcessor
+        return BulkProcessor(self.config['PROCESS_POOL_WORKERS'], self.config['BULK_CHUNK_SIZE'])
+
+    def _build_n8n_integration(self):
+        from n8n_integration import N8NIntegration
+        return N8NIntegration()
+
+    def _build_result_cache(self):
+        # With a shared cache backend, cursors work on every worker
+        backend = self.cache if self.config['CACHE_BACKEND'] != 'memory' else None
+        return ResultCache(self.config['RESULT_CACHE_SIZE'], self.config['RESULT_CACHE_TTL'], backend)
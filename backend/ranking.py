@@ -0,0 +1,145 @@
+import base64
+import heapq
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+DIFFICULTY_LABELS = ["Very Easy", "Easy", "Medium", "Hard", "Very Hard"]
+
+
+def _score(item):
+    return item['opportunity_score']
+
+
+def filter_keywords(keywords, min_score=None, difficulty=None):
+    """Drop keywords below min_score or outside the requested difficulty labels"""
+    if difficulty:
+        wanted = {d.strip().lower() for d in difficulty}
+    else:
+        wanted = None
+
+    for item in keywords:
+        if min_score is not None and item['opportunity_score'] < min_score:
+            continue
+        if wanted is not None and item.get('difficulty', '').lower() not in wanted:
+            continue
+        yield item
+
+
+def top_k(keywords, limit, offset=0, min_score=None, difficulty=None):
+    """Return one page of the best keywords without sorting the whole list.
+
+    heapq.nlargest only keeps offset + limit items around, so large expansions
+    cost O(n log k) instead of a full sort.
+    """
+    candidates = filter_keywords(keywords, min_score, difficulty)
+    best = heapq.nlargest(offset + limit, candidates, key=_score)
+    return best[offset:offset + limit]
+
+
+def parse_difficulty(value):
+    """Accept 'Easy,Medium' or ['Easy', 'Medium'] and return a list of labels"""
+    if not value:
+        return None
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, (list, tuple)) or not all(isinstance(v, str) for v in value):
+        raise ValueError('difficulty must be a string or a list of strings')
+    labels = [v.strip() for v in value if v and v.strip()]
+    unknown = [v for v in labels if v.lower() not in {d.lower() for d in DIFFICULTY_LABELS}]
+    if unknown:
+        raise ValueError(f"Unknown difficulty: {', '.join(unknown)}")
+    return labels or None
+
+
+def encode_cursor(result_id, offset):
+    raw = f"{result_id}:{offset}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        result_id, offset = base64.urlsafe_b64decode(padded).decode().rsplit(':', 1)
+        return result_id, int(offset)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
+
+class ResultCache:
+    """Keeps ranked result sets so clients can page without recomputing.
+
+    Result sets live in this process unless a shared CacheBackend is given,
+    in which case a cursor issued by one worker can be read by any other.
+    """
+
+    def __init__(self, max_entries=100, ttl=900, backend=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.backend = backend
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def put(self, keywords, meta=None):
+        """Store a result set and return its id; local sets are ranked on first read"""
+        result_id = uuid.uuid4().hex[:16]
+        if self.backend is not None:
+            # Other workers can't tell whether it was ranked yet, so rank it now
+            ranked = sorted(keywords, key=_score, reverse=True)
+            self.backend.set(f"results:{result_id}", {'keywords': ranked, 'meta': meta or {}}, self.ttl)
+            return result_id
+        with self._lock:
+            self._entries[result_id] = (time.time(), keywords, meta or {}, False)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return result_id
+
+    def get(self, result_id):
+        if self.backend is not None:
+            entry = self.backend.get(f"results:{result_id}")
+            return (entry['keywords'], entry['meta']) if entry is not None else None
+        with self._lock:
+            entry = self._entries.get(result_id)
+            if entry is None:
+                return None
+            created, keywords, meta, ranked = entry
+            if time.time() - created > self.ttl:
+                del self._entries[result_id]
+                return None
+            if not ranked:
+                # Only result sets someone actually pages through pay for a full sort
+                keywords = sorted(keywords, key=_score, reverse=True)
+                self._entries[result_id] = (created, keywords, meta, True)
+            self._entries.move_to_end(result_id)
+            return keywords, meta
+
+
+def paginate(keywords, limit, offset=0, min_score=None, difficulty=None, cache=None, meta=None):
+    """Rank keywords and return (page, total_matches, next_cursor).
+
+    The page itself comes from top_k. When a cache is given and there are more
+    matches, the filtered set is stored so next_cursor can be used with
+    page_from_cursor later on.
+    """
+    matches = list(filter_keywords(keywords, min_score, difficulty))
+    page = top_k(matches, limit, offset)
+    next_cursor = None
+    if cache is not None and offset + limit < len(matches):
+        result_id = cache.put(matches, meta)
+        next_cursor = encode_cursor(result_id, offset + limit)
+    return page, len(matches), next_cursor
+
+
+def page_from_cursor(cache, cursor, limit):
+    """Return (page, total_matches, next_cursor, meta) for a previously cached result set"""
+    result_id, offset = decode_cursor(cursor)
+    cached = cache.get(result_id)
+    if cached is None:
+        raise KeyError('Cursor expired or unknown')
+    ranked, meta = cached
+    page = ranked[offset:offset + limit]
+    next_cursor = None
+    if offset + limit < len(ranked):
+        next_cursor = encode_cursor(result_id, offset + limit)
+    return page, len(ranked), next_cursor, meta
@@ -0,0 +1,238 @@
+import requests
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeout, as_completed
+from cache_backends import MemoryCache
+from deadlines import DeadlineExceeded, LatencyTracker, call_timeout, hedged_call
+from processing import difficulty_label, estimate_metrics, opportunity_score, score_upper_bound
+
+class SERankingAnalyzer:
+    def __init__(self, api_key=None, base_url="https://api4.seranking.com", max_workers=8, cache=None,
+                 cache_ttl=86400, request_timeout=15, hedge=False):
+        self.api_key = api_key if api_key is not None else os.getenv('SE_RANKING_API_KEY', '')
+        self.base_url = base_url.rstrip('/')
+        self.max_workers = max_workers
+        self.request_timeout = request_timeout
+        # Hedged requests: send a duplicate once a call runs past the p95 latency
+        self.hedge = hedge
+        self.latency = LatencyTracker()
+        self._hedge_pool = ThreadPoolExecutor(max_workers=max_workers * 2) if hedge else None
+        # Metrics per (keyword, country, language) so markets never mix;
+        # pass a shared backend from cache_backends.py to share across workers
+        self.cache = cache if cache is not None else MemoryCache()
+        self.cache_ttl = cache_ttl
+        
+    def analyze(self, keywords, min_score=None, country='us', language='en', deadline=None, max_results=None):
+        """Look up each keyword; max_results stops once that many reach min_score"""
+        analyzed_keywords = []
+        matches = 0
+        
+        for keyword in keywords:
+            if max_results is not None and matches >= max_results:
+                break
+            
+            # Skip the API call when even the best case can't reach the cutoff
+            if min_score is not None and self._estimate_score_upper_bound(keyword) < min_score:
+                continue
+            
+            # Out of time (or cancelled): no more lookups, estimates only
+            if deadline is not None and deadline.expired():
+                analyzed_keywords.append(self._estimated_result(keyword, 'Estimated (Deadline)'))
+                continue
+            
+            result = self._analyze_keyword(keyword, country, language, deadline)
+            analyzed_keywords.append(result)
+            if min_score is None or result['opportunity_score'] >= min_score:
+                matches += 1
+        
+        return analyzed_keywords
+    
+    def analyze_locales(self, keywords, locales, min_score=None, deadline=None):
+        """Look up every keyword in every locale concurrently.
+
+        Returns one row per keyword with the metrics for each market side by
+        side under 'markets'. The row's opportunity_score and difficulty come
+        from its best market so the usual ranking helpers still apply.
+        """
+        if min_score is not None:
+            keywords = [kw for kw in keywords if self._estimate_score_upper_bound(kw) >= min_score]
+        
+        jobs = {}
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        for country, language in locales:
+            for keyword in keywords:
+                future = pool.submit(self._analyze_keyword, keyword, country, language, deadline)
+                jobs[future] = (keyword, f"{country}-{language}")
+        
+        markets_by_keyword = {kw: {} for kw in keywords}
+        try:
+            timeout = deadline.remaining() if deadline is not None else None
+            for future in as_completed(jobs, timeout=timeout):
+                keyword, market = jobs[future]
+                metrics = future.result()
+                del metrics['keyword']
+                markets_by_keyword[keyword][market] = metrics
+        except FuturesTimeout:
+            # Out of time: whatever hasn't finished comes back as an estimate
+            for future, (keyword, market) in jobs.items():
+                if market not in markets_by_keyword[keyword]:
+                    metrics = self._estimated_result(keyword, 'Estimated (Deadline)')
+                    del metrics['keyword']
+                    markets_by_keyword[keyword][market] = metrics
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+        
+        rows = []
+        for keyword, markets in markets_by_keyword.items():
+            best_market = max(markets, key=lambda m: markets[m]['opportunity_score'])
+            rows.append({
+                'keyword': keyword,
+                'opportunity_score': markets[best_market]['opportunity_score'],
+                'difficulty': markets[best_market]['difficulty'],
+                'best_market': best_market,
+                'markets': markets
+            })
+        
+        return rows
+    
+    def _analyze_keyword(self, keyword, country='us', language='en', deadline=None):
+        cache_key = f"metrics:{country}:{language}:{' '.join(keyword.lower().split())}"
+        wait_timeout = deadline.remaining() if deadline is not None else None
+        result = self.cache.get_or_compute(
+            cache_key, lambda: self._fetch_metrics(keyword, country, language, deadline),
+            self.cache_ttl, wait_timeout=wait_timeout
+        )
+        
+        if result is None:
+            # Estimates are never cached, so a later request (with more budget,
+            # or once the API is back) gets real data
+            expired = deadline is not None and deadline.expired()
+            return self._estimated_result(keyword, 'Estimated (Deadline)' if expired else 'Estimated (API Fallback)')
+        return dict(result, keyword=keyword)
+    
+    def _fetch_metrics(self, keyword, country, language, deadline):
+        """Real SE Ranking metrics, or None so the caller serves an uncached estimate"""
+        try:
+            volume, competition, cpc = self._get_se_ranking_data(keyword, country, language, deadline)
+        except DeadlineExceeded:
+            return None
+        except Exception as e:
+            print(f"SE Ranking API error for '{keyword}': {e}")
+            return None
+        
+        return self._build_result(keyword, volume, competition, cpc, 'SE Ranking API')
+    
+    def _estimated_result(self, keyword, data_source):
+        volume, competition, cpc = self._get_enhanced_estimated_data(keyword)
+        return self._build_result(keyword, volume, competition, cpc, data_source)
+    
+    def _build_result(self, keyword, volume, competition, cpc, data_source):
+        return {
+            'keyword': keyword,
+            'monthly_volume': volume,
+            'competition': competition,
+            'cpc': cpc,
+            'opportunity_score': self._calculate_opportunity_score(volume, competition, cpc),
+            'difficulty': self._get_difficulty_label(competition),
+            'data_source': data_source
+        }
+    
+    def _post(self, url, data, headers, deadline=None):
+        """POST to SE Ranking with a deadline-aware timeout, hedged if enabled"""
+        timeout = call_timeout(deadline, self.request_timeout)
+        
+        def call():
+            started = time.monotonic()
+            try:
+                response = requests.post(url, json=data, headers=headers, timeout=timeout)
+            except requests.Timeout:
+                # Timeouts count at full length, so a slowing API raises the
+                # hedge delay instead of doubling traffic at the worst moment
+                self.latency.record(timeout)
+                raise
+            self.latency.record(time.monotonic() - started)
+            return response
+        
+        delay = self.latency.percentile(95) if self.hedge else None
+        if delay is None or delay >= timeout:
+            return call()
+        return hedged_call(self._hedge_pool, call, delay, timeout)
+    
+    def _get_se_ranking_data(self, keyword, country='us', language='en', deadline=None):
+        """Get real SEO data from SE Ranking API; raises if neither endpoint answers"""
+        try:
+            # First, try the keyword suggestions endpoint
+            url = f"{self.base_url}/research/keywords/suggestions"
+            headers = {
+                'Authorization': f'Token {self.api_key}',
+                'Content-Type': 'application/json'
+            }
+            data = {
+                'keyword': keyword,
+                'language': language,
+                'country': country
+            }
+            
+            response = self._post(url, data, headers, deadline)
+            
+            if response.status_code == 200:
+                api_data = response.json()
+                print(f"🔍 SE Ranking API response for '{keyword}': {api_data}")
+                
+                # Parse the response based on SE Ranking's format
+                if isinstance(api_data, list) and len(api_data) > 0:
+                    # Get the most relevant suggestion
+                    keyword_data = api_data[0]
+                    volume = keyword_data.get('search_volume', 100)
+                    competition = keyword_data.get('competition_level', 50)
+                    cpc = keyword_data.get('cpc', 1.0)
+                    
+                    return volume, competition, cpc
+                
+            # If suggestions endpoint doesn't work, try analysis endpoint
+            analysis_url = f"{self.base_url}/analysis/keyword"
+            analysis_data = {
+                'keyword': keyword,
+                'country': country,
+                'language': language
+            }
+            
+            analysis_response = self._post(analysis_url, analysis_data, headers, deadline)
+            
+            if analysis_response.status_code == 200:
+                analysis_data = analysis_response.json()
+                volume = analysis_data.get('search_volume', 100)
+                competition = analysis_data.get('competition', 50)
+                cpc = analysis_data.get('cpc', 1.0)
+                return volume, competition, cpc
+                
+            raise requests.HTTPError(
+                f"SE Ranking API returned {analysis_response.status_code}", response=analysis_response
+            )
+                
+        except DeadlineExceeded:
+            raise
+        except Exception as e:
+            # A timeout cut short by the deadline is not an API failure
+            if deadline is not None and deadline.expired():
+                raise DeadlineExceeded(str(e))
+            raise
+    
+    def _get_enhanced_estimated_data(self, keyword):
+        """Enhanced estimation when API is unavailable"""
+        return estimate_metrics(keyword)
+    
+    def _estimate_score_upper_bound(self, keyword):
+        """Best possible opportunity score for a keyword, before any lookup"""
+        # Real SE Ranking data can score anything, so the heuristic bound only
+        # applies when there is no API key and every result is an estimate
+        if self.api_key:
+            return opportunity_score(10000, 0, 10)
+        return score_upper_bound(keyword)
+    
+    def _calculate_opportunity_score(self, volume, competition, cpc):
+        """Calculate opportunity score considering volume, competition, and CPC"""
+        return opportunity_score(volume, competition, cpc)
+    
+    def _get_difficulty_label(self, competition):
+        return difficulty_label(competition)
@@ -0,0 +1,239 @@
+"""Tests for cache_backends.py; run with `python -m pytest` from backend/"""
+import multiprocessing
+import os
+import threading
+import time
+
+import pytest
+
+from cache_backends import MemoryCache, RedisCache, SQLiteCache
+
+
+class FakeRedis:
+    """The few Redis commands RedisCache uses, kept in one process"""
+
+    def __init__(self, decode_responses=False):
+        self.decode_responses = decode_responses
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def _encode(self, value):
+        value = value.encode() if isinstance(value, str) else value
+        return value.decode() if self.decode_responses else value
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at is not None and time.time() > expires_at:
+                del self._data[key]
+                return None
+            return value
+
+    def set(self, key, value, ex=None, nx=False):
+        with self._lock:
+            entry = self._data.get(key)
+            if nx and entry is not None and (entry[1] is None or entry[1] > time.time()):
+                return None
+            self._data[key] = (self._encode(value), time.time() + ex if ex else None)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            return 1 if self._data.pop(key, None) is not None else 0
+
+    def pipeline(self):
+        return FakePipeline(self)
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self._queued = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def watch(self, key):
+        pass
+
+    def unwatch(self):
+        pass
+
+    def get(self, key):
+        return self.client.get(key)
+
+    def multi(self):
+        self._queued = []
+
+    def delete(self, key):
+        self._queued.append(key)
+
+    def execute(self):
+        return [self.client.delete(key) for key in self._queued]
+
+
+@pytest.fixture(params=['memory', 'sqlite', 'redis', 'redis-decoded'])
+def cache(request, tmp_path):
+    if request.param == 'memory':
+        return MemoryCache()
+    if request.param == 'sqlite':
+        return SQLiteCache(str(tmp_path / 'cache.db'))
+    return RedisCache(client=FakeRedis(decode_responses=request.param == 'redis-decoded'))
+
+
+def test_get_set_delete(cache):
+    assert cache.get('missing') is None
+    cache.set('key', {'volume': 100, 'keywords': ['a', 'b']})
+    assert cache.get('key') == {'volume': 100, 'keywords': ['a', 'b']}
+    cache.delete('key')
+    assert cache.get('key') is None
+
+
+def test_ttl_expires(cache):
+    cache.set('key', 'value', ttl=1)
+    assert cache.get('key') == 'value'
+    time.sleep(1.1)
+    assert cache.get('key') is None
+
+
+def test_none_is_returned_but_not_cached(cache):
+    cache.failure_ttl = 1
+    assert cache.get_or_compute('key', lambda: None) is None
+    assert cache.get('key') is None
+    # Within failure_ttl callers share the failure instead of retrying
+    assert cache.get_or_compute('key', lambda: 'real') is None
+    time.sleep(1.1)
+    assert cache.get_or_compute('key', lambda: 'real') == 'real'
+    assert cache.get('key') == 'real'
+
+
+def test_failed_compute_is_shared_with_waiters(cache):
+    calls = []
+    start = threading.Barrier(4)
+    latencies = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.5)
+        return None
+
+    def worker():
+        start.wait()
+        started = time.monotonic()
+        assert cache.get_or_compute('key', compute) is None
+        latencies.append(time.monotonic() - started)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert max(latencies) < 1.0
+
+
+def test_lock_is_released(cache):
+    cache.get_or_compute('key', lambda: 'value')
+    token = cache._acquire('key')
+    assert token is not None
+    cache._release('key', token)
+    assert cache._acquire('key') is not None
+
+
+def test_single_compute_under_thread_contention(cache):
+    calls = []
+    start = threading.Barrier(8)
+    results = []
+
+    def compute():
+        calls.append(1)
+        time.sleep(0.2)
+        return 'value'
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_compute('key', compute))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert results == ['value'] * 8
+
+
+def test_waiter_times_out_and_computes_itself(cache):
+    # Someone else holds the lock and never finishes
+    assert cache._acquire('key') is not None
+    calls = []
+
+    def compute():
+        calls.append(1)
+        return 'value'
+
+    started = time.monotonic()
+    assert cache.get_or_compute('key', compute, wait_timeout=0.2) == 'value'
+    assert time.monotonic() - started < 2
+    assert calls == [1]
+
+
+def test_sqlite_purge_drops_expired_and_excess_rows(tmp_path):
+    cache = SQLiteCache(str(tmp_path / 'cache.db'), max_entries=5)
+    cache.set('expired', 'value', ttl=1)
+    for i in range(10):
+        cache.set(f"key{i}", i, ttl=100 + i)
+    cache.set('forever', 'value')
+    time.sleep(1.1)
+    cache.purge()
+
+    count = cache._conn().execute('SELECT COUNT(*) FROM cache').fetchone()[0]
+    assert count == 5
+    assert cache.get('forever') == 'value'
+    assert cache.get('key9') == 9
+    assert cache.get('key0') is None
+
+
+def _compute_in_process(path, log_path, barrier):
+    def compute():
+        with open(log_path, 'a') as log:
+            log.write(f"{os.getpid()}\n")
+        time.sleep(0.3)
+        return 'value'
+
+    barrier.wait()
+    return SQLiteCache(path).get_or_compute('key', compute)
+
+
+def test_sqlite_single_compute_under_process_contention(tmp_path):
+    path = str(tmp_path / 'cache.db')
+    log_path = str(tmp_path / 'computes.log')
+    SQLiteCache(path)
+
+    ctx = multiprocessing.get_context('spawn')
+    with ctx.Manager() as manager:
+        barrier = manager.Barrier(4)
+        with ctx.Pool(4) as pool:
+            results = pool.starmap(_compute_in_process, [(path, log_path, barrier)] * 4)
+
+    assert results == ['value'] * 4
+    with open(log_path) as log:
+        assert len(log.read().splitlines()) == 1
+
+
+def test_redis_with_fakeredis():
+    fakeredis = pytest.importorskip('fakeredis')
+    client = fakeredis.FakeRedis(decode_responses=True)
+    cache = RedisCache(client=client)
+
+    assert cache.get_or_compute('key', lambda: {'a': 1}, ttl=60) == {'a': 1}
+    assert cache.get('key') == {'a': 1}
+    assert client.get('seo-agent:lock:key') is None